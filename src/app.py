@@ -1,3 +1,4 @@
+import math
 import streamlit as st
 import sys
 import os
@@ -8,6 +9,7 @@ sys.path.append(str(Path(__file__).parent))
 
 from models.data_models import DataLoader
 from services.gemini_service import GeminiService
+from utils.dropdown import build_labels
 
 # Page configuration
 st.set_page_config(
@@ -26,6 +28,16 @@ def get_data_loader():
 def get_gemini_service():
     return GeminiService()
 
+# Notifications shown per dropdown page
+PAGE_SIZE = 100
+
+# Recomputed only when the CSV or saved summaries change
+@st.cache_data(ttl=300)
+def get_dropdown_options(country, page, data_version):
+    return get_data_loader().get_dropdown_options(
+        country, offset=(page - 1) * PAGE_SIZE, limit=PAGE_SIZE
+    )
+
 def main():
     st.title("📋 Notification Summarizer")
     st.markdown("**Step 1:** Select a country → **Step 2:** Choose a notification → **Step 3:** View/Generate summary")
@@ -48,7 +60,15 @@ def main():
     
     # Load dropdown options
     try:
-        options = data_loader.get_dropdown_options(country)
+        page_count = max(1, math.ceil(data_loader.count_notifications(country) / PAGE_SIZE))
+        page = st.sidebar.number_input(
+            "Page",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            help=f"Notifications are listed {PAGE_SIZE} per page"
+        )
+        options = get_dropdown_options(country, page, data_loader.data_version(country))
         
         if not options:
             st.warning("No notifications found for the selected country.")
@@ -66,17 +86,33 @@ def main():
                     st.write(f"USA data columns: {list(data.columns)}")
             return
         
-        # Create dropdown with "Select notification" as first option
-        option_labels = ["🔍 Select a notification..."]
-        option_values = [None]
+        # Bulk-generate summaries for the listed notifications that lack one
+        missing_ids = [option['id'] for option in options if not option['has_summary']]
+        if gemini_service.is_available() and missing_ids:
+            if st.sidebar.button(f"🤖 Generate all missing summaries ({len(missing_ids)})"):
+                with st.spinner("🔄 Generating summaries using Gemini AI..."):
+                    notifications = [data_loader.get_notification_by_id(country, nid) for nid in missing_ids]
+                    notifications = [n for n in notifications if n]
+                    summaries = gemini_service.generate_batch(
+                        [(n.title, n.text) for n in notifications]
+                    )
+                    
+                    # One sidecar file for the whole run rather than one per summary
+                    saved_count = data_loader.save_summaries(
+                        country,
+                        [(n.id, summary) for n, summary in zip(notifications, summaries) if summary]
+                    )
+                
+                st.sidebar.success(f"✅ Saved {saved_count} of {len(notifications)} summaries")
+                
+                # Re-read only the options (their cache key changed) instead of rerunning
+                options = get_dropdown_options(country, page, data_loader.data_version(country))
         
-        for option in options:
-            title_preview = option['title'][:60] + "..." if len(option['title']) > 60 else option['title']
-            label = f"{title_preview} | {option['date']}"
-            if option['has_summary']:
-                label += " ✅"
-            option_labels.append(label)
-            option_values.append(option['id'])
+        # Create dropdown with "Select notification" as first option
+        option_labels, option_values = build_labels(
+            tuple((o['id'], o['title'], o['date'], o['has_summary']) for o in options),
+            truncate=60
+        )
         
         # Main content area
         col1, col2 = st.columns([1, 2])
@@ -134,11 +170,11 @@ def main():
                                     # Save summary to CSV
                                     data_loader.save_summary(country, selected_id, summary)
                                     
+                                    # Update notification object
+                                    notification.summary = summary
+                                    
                                     st.success("✅ Summary generated successfully!")
                                     st.write(summary)
-                                    
-                                    # Refresh the page to show updated data
-                                    st.rerun()
                                 else:
                                     st.error("❌ Failed to generate summary. Please try again.")
                     else:
@@ -8,6 +8,7 @@ sys.path.append(str(Path(__file__).parent))
 
 from services.mongodb_service import MongoDBService
 from services.gemini_service import GeminiService
+from utils.dropdown import build_labels
 
 # Page configuration
 st.set_page_config(
@@ -20,12 +21,24 @@ st.set_page_config(
 # Initialize services
 @st.cache_resource
 def get_mongodb_service():
-    return MongoDBService()
+    service = MongoDBService()
+    service.bootstrap()
+    return service
 
 @st.cache_resource
 def get_gemini_service():
     return GeminiService()
 
+# Sidebar metrics may lag writes by up to the TTL
+@st.cache_data(ttl=30)
+def get_collection_stats(country):
+    return get_mongodb_service().get_collection_stats(country)
+
+# Recomputed only when a notification in the collection changes
+@st.cache_data(ttl=300)
+def get_dropdown_options(country, last_modified):
+    return get_mongodb_service().get_dropdown_options(country)
+
 def main():
     st.title("📋 Notification Summarizer")
     st.markdown("**Step 1:** Select a country → **Step 2:** Choose a notification → **Step 3:** View/Generate summary")
@@ -49,7 +62,7 @@ def main():
     )
     
     # Show database statistics
-    stats = mongodb_service.get_collection_stats(country)
+    stats = get_collection_stats(country)
     if stats:
         st.sidebar.metric("Total Notifications", stats.get('total_notifications', 0))
         st.sidebar.metric("With Summaries", stats.get('with_summaries', 0))
@@ -61,7 +74,7 @@ def main():
     
     # Load dropdown options
     try:
-        options = mongodb_service.get_dropdown_options(country)
+        options = get_dropdown_options(country, mongodb_service.get_last_modified(country))
         
         if not options:
             st.warning("No notifications found for the selected country.")
@@ -69,21 +82,34 @@ def main():
             with st.expander("🔍 Debug Information"):
                 st.write(f"Country: {country}")
                 st.write(f"DB connected: {mongodb_service.is_connected()}")
-                stats = mongodb_service.get_collection_stats(country)
                 st.write(f"Collection stats: {stats}")
             return
         
-        # Create dropdown with "Select notification" as first option
-        option_labels = ["🔍 Select a notification..."]
-        option_values = [None]
+        # Bulk-generate summaries for the listed notifications that lack one
+        missing_ids = [option['id'] for option in options if not option['has_summary']]
+        if gemini_service.is_available() and missing_ids:
+            if st.sidebar.button(f"🤖 Generate all missing summaries ({len(missing_ids)})"):
+                with st.spinner("🔄 Generating summaries... "):
+                    # One query on the pooled client instead of a lookup per id
+                    notifications = mongodb_service.get_notifications_by_ids(country, missing_ids)
+                    notifications = [n for n in notifications if n]
+                    summaries = gemini_service.generate_batch(
+                        [(n.title, n.text) for n in notifications]
+                    )
+                    
+                    saved_count = mongodb_service.save_summaries_bulk(
+                        country,
+                        [(n.id, summary) for n, summary in zip(notifications, summaries) if summary]
+                    )
+                
+                st.sidebar.success(f"✅ Saved {saved_count} of {len(notifications)} summaries")
+                # Re-read only the options (their cache key changed) instead of rerunning
+                options = get_dropdown_options(country, mongodb_service.get_last_modified(country))
         
-        for option in options:
-            title_preview = option['title']
-            label = f"{title_preview} | {option['date']}"
-            if option['has_summary']:
-                label += " ✅"
-            option_labels.append(label)
-            option_values.append(option['id'])
+        # Create dropdown with "Select notification" as first option
+        option_labels, option_values = build_labels(
+            tuple((o['id'], o['title'], o['date'], o['has_summary']) for o in options)
+        )
         
         # Main content area
         col1, col2 = st.columns([1, 2])
@@ -145,11 +171,8 @@ def main():
                                         # Update notification object
                                         notification.summary = summary
                                         
-                                        st.success("✅ Summary generated and saved successfully! (kindly reload the page to get the updated rendered!)")
+                                        st.success("✅ Summary generated and saved successfully!")
                                         st.write(summary)
-                                        
-                                        # Refresh the page to show updated data
-                                        # st.rerun()
                                     else:
                                         st.error("Failed to save summary")
                                 else:
@@ -1,8 +1,23 @@
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Tuple
+import csv
+import mmap
+import os
+import threading
+import time
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pac
 from datetime import datetime
 
+# Positional column names for the raw CSV files; any extra trailing
+# columns (e.g. a previously saved summary column) keep their header name
+INDIA_COLUMNS = ['index', 'id', 'date', 'title', 'url', 'text']
+USA_COLUMNS = ['index', 'date', 'title', 'url', 'text']
+CSV_FILES = {'india': 'IND_data.csv', 'usa': 'USA_data.csv'}
+
 @dataclass
 class Notification:
     """Data model for notification entries"""
@@ -25,23 +40,251 @@ class CountryData:
 class DataLoader:
     """Utility class for loading and managing CSV data"""
     
+    # Number of materialized notifications kept for repeated lookups
+    NOTIFICATION_CACHE_SIZE = 128
+    
     def __init__(self, data_dir: str = "./"):
         self.data_dir = data_dir
         self.india_data = None
         self.usa_data = None
+        # id category code -> row position, built once per load
+        self.india_index = None
+        self.usa_index = None
+        # (sorted int64 ids, row positions) when every id is numeric
+        self.india_int_index = None
+        self.usa_int_index = None
+        # (byte offset, length) of each row's text field in the CSV
+        self.india_text_offsets = None
+        self.usa_text_offsets = None
+        # Dropdown rows sorted by id, rebuilt lazily after summaries change
+        self.india_drop = None
+        self.usa_drop = None
+        self._notification_cache = OrderedDict()
+        # One loader is shared by every Streamlit session thread
+        self._lock = threading.Lock()
+    
+    def _csv_path(self, country: str) -> str:
+        """Path of a country's notification CSV"""
+        return f"{self.data_dir}/{CSV_FILES[country.lower()]}"
+    
+    def _summary_path(self, country: str) -> str:
+        """Path of the append-only summaries dataset for a country"""
+        return f"{self.data_dir}/{country.lower()}_summaries.parquet"
+    
+    def saved_summaries(self, country: str) -> Optional[pd.Series]:
+        """Latest sidecar summary per notification id, or None if none were saved"""
+        path = self._summary_path(country)
+        if not os.path.isdir(path):
+            return None
+        
+        with self._lock:
+            files = sorted(f"{path}/{name}" for name in os.listdir(path) if name.endswith('.parquet'))
+            if not files:
+                return None
+            
+            latest = (
+                pd.read_parquet(files, engine="pyarrow")
+                .sort_values('updated_at', kind='stable')
+                .drop_duplicates('id', keep='last')
+            )
+            
+            # Fold the files saved since the last load into one, so reads stay
+            # a single file however many saves came before
+            if len(files) > 1:
+                self._write_summaries(path, latest)
+                for file in files:
+                    os.remove(file)
+        
+        return latest.set_index('id')['summary']
+    
+    @staticmethod
+    def _write_summaries(path: str, records: pd.DataFrame):
+        """Add one file to a summaries dataset, renamed into place so readers never see it half-written"""
+        os.makedirs(path, exist_ok=True)
+        target = f"{path}/{time.time_ns()}.parquet"
+        records.to_parquet(f"{target}.tmp", engine="pyarrow", index=False)
+        os.replace(f"{target}.tmp", target)
+    
+    def _merge_summaries(self, data: pd.DataFrame, country: str, latest: Optional[pd.Series] = None) -> pd.DataFrame:
+        """Overlay summaries saved in the sidecar dataset onto loaded CSV data"""
+        if 'summary' not in data.columns:
+            data['summary'] = ''
+        
+        # Callers merging many chunks pass the sidecar in to read it only once
+        if latest is None:
+            latest = self.saved_summaries(country)
+        if latest is None:
+            return data
+        
+        saved = data['id'].astype(str).map(latest)
+        data['summary'] = saved.where(saved.notna(), data['summary']).fillna('')
+        return data
+    
+    def _read_csv(self, path: str, names: List[str], column_types: dict, include_text: bool) -> pd.DataFrame:
+        """Parse a notification CSV with Arrow's multithreaded reader"""
+        table = pac.read_csv(
+            path,
+            read_options=pac.ReadOptions(
+                use_threads=True,
+                block_size=8 << 20,
+                # Standardize column names while parsing
+                column_names=names,
+                skip_rows=1
+            ),
+            parse_options=pac.ParseOptions(newlines_in_values=True),
+            convert_options=pac.ConvertOptions(
+                column_types=column_types,
+                # Empty string cells stay '' so no null handling is needed later
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+                include_columns=names if include_text else [n for n in names if n != 'text']
+            )
+        )
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    
+    @staticmethod
+    def _scan_text_offsets(path: str, column: int, n_columns: int) -> Optional[np.ndarray]:
+        """Find the byte range of one column in every data row of a CSV"""
+        raw = np.fromfile(path, dtype=np.uint8)
+        if raw.size == 0:
+            return None
+        
+        # A byte is inside a quoted field when an odd number of quotes precede it;
+        # escaped quotes ("") come in pairs and leave the parity unchanged
+        inside = np.cumsum(raw == ord('"'), dtype=np.uint8) & 1
+        separators = np.flatnonzero(((raw == ord(',')) | (raw == ord('\n'))) & (inside == 0))
+        if raw[-1] != ord('\n'):
+            separators = np.append(separators, raw.size)
+        if separators.size % n_columns:
+            return None
+        
+        # Every row must be exactly n_columns fields ending in a newline
+        rows = separators.reshape(-1, n_columns)
+        row_ends = rows[:, -1]
+        if not (raw[rows[:, :-1]] == ord(',')).all():
+            return None
+        if not ((row_ends == raw.size) | (raw[np.minimum(row_ends, raw.size - 1)] == ord('\n'))).all():
+            return None
+        
+        previous = rows[:, column - 1] if column else np.concatenate(([-1], row_ends[:-1]))
+        start = previous + 1
+        end = rows[:, column]
+        if column == n_columns - 1:
+            end = end - (raw[np.maximum(end - 1, 0)] == ord('\r'))
+        # Skip the header row
+        return np.column_stack([start, end - start])[1:].astype(np.int64)
+    
+    def _load_text_offsets(self, path: str, country: str, names: List[str]) -> Optional[np.ndarray]:
+        """Load the text offsets for a CSV, rebuilding them when the CSV is newer"""
+        index_path = f"{self.data_dir}/{country.lower()}_text_index.npy"
+        try:
+            if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(path):
+                return np.load(index_path)
+            
+            offsets = self._scan_text_offsets(path, names.index('text'), len(names))
+            if offsets is not None:
+                np.save(index_path, offsets)
+            return offsets
+        except Exception as e:
+            print(f"Error building text index: {e}")
+            return None
+    
+    def _load_csv(self, country: str, columns: List[str], column_types: dict) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+        """Load a country CSV without its text column, plus the text offsets"""
+        path = self._csv_path(country)
+        with open(path, newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f))
+        # Extra trailing columns (e.g. a saved summary column) keep their header name
+        names = columns + header[len(columns):]
+        
+        offsets = self._load_text_offsets(path, country, names)
+        data = self._read_csv(path, names, column_types, include_text=offsets is None)
+        if offsets is not None and len(offsets) != len(data):
+            # The byte scan disagrees with the parser, so parse the text instead
+            offsets = None
+            data = self._read_csv(path, names, column_types, include_text=True)
+        return data, offsets
+    
+    def _read_text(self, country: str, data: pd.DataFrame, offsets: Optional[np.ndarray], position: int) -> str:
+        """Read one notification's text, straight from the CSV when it was not parsed"""
+        if offsets is None:
+            return str(data['text'].iat[position])
+        
+        start, length = offsets[position]
+        with open(self._csv_path(country), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                field = mm[start:start + length]
+        if field[:1] == b'"':
+            field = field[1:-1].replace(b'""', b'"')
+        return field.decode('utf-8', 'replace')
+    
+    @staticmethod
+    def _categorize(data: pd.DataFrame) -> pd.DataFrame:
+        """Store repeated/lookup string columns as categoricals"""
+        for column in ('date', 'id'):
+            data[column] = data[column].astype('category')
+        return data
+    
+    @staticmethod
+    def _build_index(data: pd.DataFrame) -> np.ndarray:
+        """Map each id category code to its row position"""
+        codes = data['id'].cat.codes.to_numpy()
+        positions = np.empty(len(data['id'].cat.categories), dtype=np.int64)
+        positions[codes] = np.arange(len(codes))
+        return positions
+    
+    @staticmethod
+    def _build_int_index(data: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Sort ids as int64 for binary search, if every id is a plain integer"""
+        ids = data['id'].astype(str)
+        # Canonical digits only, so int(id) round-trips to the stored string
+        if not ids.str.fullmatch(r'0|[1-9]\d{0,17}').all():
+            return None
+        values = ids.astype(np.int64).to_numpy()
+        order = np.argsort(values, kind='stable')
+        return values[order], order
+    
+    def _row_position(self, country: str, notification_id: str) -> Optional[int]:
+        """Resolve a notification id to its row position in the loaded data"""
+        if country.lower() == 'india':
+            data, index, int_index = self.india_data, self.india_index, self.india_int_index
+        else:
+            data, index, int_index = self.usa_data, self.usa_index, self.usa_int_index
+        
+        if int_index is not None:
+            try:
+                value = int(notification_id)
+            except (TypeError, ValueError):
+                return None
+            sorted_ids, order = int_index
+            i = int(np.searchsorted(sorted_ids, value))
+            if i < len(sorted_ids) and sorted_ids[i] == value:
+                return int(order[i])
+            return None
+        
+        # Non-numeric ids: look up through the id categories
+        if index is None:
+            return None
+        try:
+            code = data['id'].cat.categories.get_loc(str(notification_id))
+        except KeyError:
+            return None
+        return int(index[code])
     
     def load_india_data(self) -> pd.DataFrame:
         """Load India notification data from CSV"""
         if self.india_data is None:
             try:
-                self.india_data = pd.read_csv(f"{self.data_dir}/IND_data.csv")
-                # Standardize column names
-                self.india_data.columns = ['index', 'id', 'date', 'title', 'url', 'text']
-                # Add summary column if it doesn't exist
-                if 'summary' not in self.india_data.columns:
-                    self.india_data['summary'] = None
-                # Clean the data
-                self.india_data = self.india_data.fillna('')
+                self.india_data, self.india_text_offsets = self._load_csv(
+                    'india',
+                    INDIA_COLUMNS,
+                    {"id": pa.string(), "text": pa.large_string(), "summary": pa.large_string()}
+                )
+                # Merge summaries saved since the CSV was written
+                self.india_data = self._merge_summaries(self.india_data, 'india')
+                self.india_data = self._categorize(self.india_data)
+                self.india_index = self._build_index(self.india_data)
+                self.india_int_index = self._build_int_index(self.india_data)
             except Exception as e:
                 print(f"Error loading India data: {e}")
                 return pd.DataFrame()
@@ -51,16 +294,18 @@ class DataLoader:
         """Load USA notification data from CSV"""
         if self.usa_data is None:
             try:
-                self.usa_data = pd.read_csv(f"{self.data_dir}/USA_data.csv")
-                # Standardize column names
-                self.usa_data.columns = ['index', 'date', 'title', 'url', 'text']
+                self.usa_data, self.usa_text_offsets = self._load_csv(
+                    'usa',
+                    USA_COLUMNS,
+                    {"index": pa.string(), "text": pa.large_string(), "summary": pa.large_string()}
+                )
                 # Add id column (use index as id)
-                self.usa_data['id'] = self.usa_data['index'].astype(str)
-                # Add summary column if it doesn't exist
-                if 'summary' not in self.usa_data.columns:
-                    self.usa_data['summary'] = None
-                # Clean the data
-                self.usa_data = self.usa_data.fillna('')
+                self.usa_data['id'] = self.usa_data['index']
+                # Merge summaries saved since the CSV was written
+                self.usa_data = self._merge_summaries(self.usa_data, 'usa')
+                self.usa_data = self._categorize(self.usa_data)
+                self.usa_index = self._build_index(self.usa_data)
+                self.usa_int_index = self._build_int_index(self.usa_data)
             except Exception as e:
                 print(f"Error loading USA data: {e}")
                 return pd.DataFrame()
@@ -68,66 +313,132 @@ class DataLoader:
     
     def get_notification_by_id(self, country: str, notification_id: str) -> Optional[Notification]:
         """Get specific notification by ID"""
+        key = (country.lower(), str(notification_id))
+        with self._lock:
+            if key in self._notification_cache:
+                self._notification_cache.move_to_end(key)
+                return self._notification_cache[key]
+        
         if country.lower() == 'india':
             data = self.load_india_data()
+            text_offsets = self.india_text_offsets
         elif country.lower() == 'usa':
             data = self.load_usa_data()
+            text_offsets = self.usa_text_offsets
         else:
             return None
         
-        # Convert id column to string for comparison
-        data['id'] = data['id'].astype(str)
-        row = data[data['id'] == str(notification_id)]
-        
-        if row.empty:
+        position = self._row_position(country, notification_id)
+        if position is None:
             return None
         
-        row = row.iloc[0]
-        return Notification(
+        row = data.iloc[position]
+        notification = Notification(
             id=str(row['id']),
             date=str(row['date']),
             title=str(row['title']),
             url=str(row['url']),
-            text=str(row['text']),
+            text=self._read_text(country, data, text_offsets, position),
             summary=row['summary'] if pd.notna(row['summary']) else None
         )
+        
+        with self._lock:
+            self._notification_cache[key] = notification
+            if len(self._notification_cache) > self.NOTIFICATION_CACHE_SIZE:
+                self._notification_cache.popitem(last=False)
+        return notification
     
     def save_summary(self, country: str, notification_id: str, summary: str):
-        """Save generated summary back to CSV"""
+        """Append generated summary to the country's summaries dataset"""
+        self.save_summaries(country, [(notification_id, summary)])
+    
+    def save_summaries(self, country: str, pairs: List[Tuple[str, str]]) -> int:
+        """Append (notification_id, summary) pairs to the summaries dataset in one file; returns how many were saved"""
         if country.lower() == 'india':
             data = self.load_india_data()
-            data.loc[data['id'] == notification_id, 'summary'] = summary
-            data.to_csv(f"{self.data_dir}/IND_data.csv", index=False)
         elif country.lower() == 'usa':
             data = self.load_usa_data()
-            data.loc[data['id'] == notification_id, 'summary'] = summary
-            data.to_csv(f"{self.data_dir}/USA_data.csv", index=False)
+        else:
+            return 0
+        
+        if not pairs:
+            return 0
+        
+        # Each save writes one small file instead of rewriting the whole CSV
+        now = datetime.utcnow()
+        records = pd.DataFrame([
+            {"id": str(notification_id), "summary": summary, "updated_at": now}
+            for notification_id, summary in pairs
+        ])
+        self._write_summaries(self._summary_path(country), records)
+        
+        # Keep the in-memory data current so the next read skips the disk
+        summary_column = data.columns.get_loc('summary')
+        for notification_id, summary in pairs:
+            position = self._row_position(country, notification_id)
+            if position is not None:
+                data.iat[position, summary_column] = summary
+        with self._lock:
+            for notification_id, _ in pairs:
+                self._notification_cache.pop((country.lower(), str(notification_id)), None)
+            if country.lower() == 'india':
+                self.india_drop = None
+            else:
+                self.usa_drop = None
+        return len(pairs)
+    
+    def data_version(self, country: str) -> tuple:
+        """Modification times of a country's CSV and summaries, for cache keys"""
+        paths = [self._csv_path(country), self._summary_path(country)]
+        return tuple(os.path.getmtime(path) if os.path.exists(path) else 0.0 for path in paths)
     
-    def get_dropdown_options(self, country: str) -> List[dict]:
-        """Get formatted dropdown options for UI"""
+    @staticmethod
+    def _build_dropdown(data: pd.DataFrame) -> np.recarray:
+        """Build the (id, title, date, has_summary) dropdown rows, sorted by id"""
+        ids = data['id'].astype(str).to_numpy(dtype=str)
+        titles = data['title'].astype(str).str.strip().to_numpy(dtype=str)
+        dates = data['date'].astype(str).str.strip().to_numpy(dtype=str)
+        has_summary = data['summary'].astype(str).str.strip().ne('').to_numpy(dtype=bool)
+        
+        # Sort numerically when every id is a number, otherwise as text
+        numeric_ids = pd.to_numeric(pd.Series(ids), errors='coerce')
+        sort_key = numeric_ids.to_numpy() if numeric_ids.notna().all() else ids
+        order = np.argsort(sort_key, kind='stable')
+        
+        return np.rec.fromarrays(
+            [ids[order], titles[order], dates[order], has_summary[order]],
+            names='id,title,date,has_summary'
+        )
+    
+    def _get_dropdown(self, country: str) -> Optional[np.recarray]:
+        """Get the sorted dropdown rows for a country, building them if needed"""
         if country.lower() == 'india':
             data = self.load_india_data()
+            # Read the rows once: a concurrent save may reset the attribute
+            with self._lock:
+                dropdown = self.india_drop
+                if dropdown is None and not data.empty:
+                    dropdown = self.india_drop = self._build_dropdown(data)
+            return dropdown
         elif country.lower() == 'usa':
             data = self.load_usa_data()
-        else:
+            with self._lock:
+                dropdown = self.usa_drop
+                if dropdown is None and not data.empty:
+                    dropdown = self.usa_drop = self._build_dropdown(data)
+            return dropdown
+        return None
+    
+    def count_notifications(self, country: str) -> int:
+        """Get the number of notifications available for a country"""
+        dropdown = self._get_dropdown(country)
+        return 0 if dropdown is None else len(dropdown)
+    
+    def get_dropdown_options(self, country: str, offset: int = 0, limit: int = 100) -> List[dict]:
+        """Get one page of formatted dropdown options for UI"""
+        dropdown = self._get_dropdown(country)
+        if dropdown is None:
             return []
         
-        # Limit to first 100 entries for better performance
-        data_subset = data.head(100)
-        
-        options = []
-        for _, row in data_subset.iterrows():
-            # Clean the data
-            title = str(row['title']).strip()
-            date = str(row['date']).strip()
-            summary = row['summary'] if pd.notna(row['summary']) else None
-            has_summary = summary is not None and str(summary).strip() != ''
-            
-            options.append({
-                'id': str(row['id']),
-                'title': title,
-                'date': date,
-                'has_summary': has_summary
-            })
-        
-        return options
+        names = dropdown.dtype.names
+        return [dict(zip(names, row)) for row in dropdown[offset:offset + limit].tolist()]
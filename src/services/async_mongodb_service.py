@@ -0,0 +1,94 @@
+from pymongo import AsyncMongoClient
+from typing import Optional, List, Dict
+import os
+from models.data_models import Notification
+from services.mongodb_service import (
+    DEFAULT_MONGODB_URI,
+    DEFAULT_DATABASE,
+    notification_from_document,
+    notifications_in_order,
+    dropdown_pipeline,
+    id_filter,
+    ids_filter
+)
+
+class AsyncMongoDBService:
+    """Non-blocking counterpart of MongoDBService for callers that overlap I/O"""
+
+    def __init__(self):
+        self.client = None
+        self.db = None
+        self._connect()
+
+    def _connect(self):
+        """Create the async MongoDB client (connects lazily on first use)"""
+        try:
+            mongodb_uri = os.getenv('MONGODB_URI', DEFAULT_MONGODB_URI)
+            database_name = os.getenv('MONGODB_DATABASE', DEFAULT_DATABASE)
+
+            self.client = AsyncMongoClient(mongodb_uri)
+            self.db = self.client[database_name]
+
+        except Exception as e:
+            print(f"Failed to connect to MongoDB: {str(e)}")
+            self.client = None
+            self.db = None
+
+    async def is_connected(self) -> bool:
+        """Check if MongoDB connection is active"""
+        try:
+            if self.client is None:
+                return False
+            await self.client.admin.command('ping')
+            return True
+        except Exception:
+            return False
+
+    async def get_notification_by_id(self, country: str, notification_id: str) -> Optional[Notification]:
+        """Get notification by ID from MongoDB"""
+        if self.db is None:
+            return None
+
+        collection = self.db[f"{country.lower()}_notifications"]
+
+        try:
+            document = await collection.find_one(id_filter(notification_id))
+            if document:
+                return notification_from_document(document)
+        except Exception as e:
+            print(f"Error retrieving notification: {str(e)}")
+
+        return None
+
+    async def get_notifications_by_ids(self, country: str, notification_ids: List[str]) -> List[Optional[Notification]]:
+        """Get several notifications in one query, preserving the requested order"""
+        if self.db is None or not notification_ids:
+            return [None] * len(notification_ids)
+
+        collection = self.db[f"{country.lower()}_notifications"]
+
+        try:
+            cursor = collection.find(ids_filter(notification_ids))
+            return notifications_in_order(await cursor.to_list(), notification_ids)
+        except Exception as e:
+            print(f"Error retrieving notifications: {str(e)}")
+            return [None] * len(notification_ids)
+
+    async def get_dropdown_options(self, country: str, limit: int = 100) -> List[Dict]:
+        """Get dropdown options for UI"""
+        if self.db is None:
+            return []
+
+        collection = self.db[f"{country.lower()}_notifications"]
+
+        try:
+            cursor = await collection.aggregate(dropdown_pipeline(limit))
+            return await cursor.to_list()
+        except Exception as e:
+            print(f"Error retrieving dropdown options: {str(e)}")
+            return []
+
+    async def close_connection(self):
+        """Close MongoDB connection"""
+        if self.client:
+            await self.client.close()
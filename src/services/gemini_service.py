@@ -1,63 +1,253 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import threading
 import google.generativeai as genai
 import os
-from typing import Optional
+from typing import List, Optional, Tuple
 import streamlit as st
 from dotenv import load_dotenv
+from services.summary_cache import SummaryCache
 
-load_dotenv()
+# Gemini model shared by every GeminiService in the process
+_SINGLETON = None
+_LOCK = threading.Lock()
+
+# Event loop shared by every batch; the SDK's async client is bound to the
+# loop it was first used on, so batches must not each start a new one
+_LOOP = None
+
+@functools.cache
+def _load_env():
+    """Load environment variables from .env once per process"""
+    load_dotenv()
+
+@functools.lru_cache(maxsize=1)
+def _api_key() -> Optional[str]:
+    """Resolve the Google API key once, reading Streamlit secrets only as a fallback"""
+    _load_env()
+    api_key = os.getenv('GOOGLE_API_KEY')
+    if api_key:
+        return api_key
+    return st.secrets.get('GOOGLE_API_KEY') if hasattr(st, 'secrets') else None
+
+def _configure_sdk(api_key: str):
+    """Configure the SDK with the API key"""
+    genai.configure(api_key=api_key)
+
+def _batch_loop() -> asyncio.AbstractEventLoop:
+    """Return the long-lived event loop for batch requests, starting it on first use"""
+    global _LOOP
+    with _LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="gemini-batch-loop", daemon=True).start()
+    return _LOOP
+
+# Per-process model and request deadline used by generate_many workers
+_WORKER_MODEL = None
+_WORKER_TIMEOUT = None
+
+def _init_worker(api_key: str, model_name: str, timeout: float):
+    """Configure the SDK inside a spawned worker process"""
+    global _WORKER_MODEL, _WORKER_TIMEOUT
+    _configure_sdk(api_key)
+    _WORKER_MODEL = genai.GenerativeModel(model_name)
+    _WORKER_TIMEOUT = timeout
+
+def _generate_in_worker(prompt: str) -> Optional[str]:
+    """Generate one summary in a worker process"""
+    try:
+        response = _WORKER_MODEL.generate_content(prompt, request_options={"timeout": _WORKER_TIMEOUT})
+        return response.text.strip()
+    except Exception as e:
+        print(f"Error generating summary: {str(e)}")
+        return None
 
 class GeminiService:
     """Service class for Gemini AI integration"""
     
+    MODEL_NAME = 'gemini-2.0-flash-exp'
+    # Gemini rate limit used to bound concurrent batch requests
+    REQUESTS_PER_MINUTE = 500
+    # Longest a single batch request may take before it is given up on
+    REQUEST_TIMEOUT_SECONDS = 120
+    # Byte budget for notification text sent in a prompt
+    MAX_TEXT_BYTES = 16000
+    PROMPT_TEMPLATE = (
+        "You are an expert in financial notifications and regulatory circulars. "
+        "Read the following text carefully and do the following:\n"
+        "1. Summarize the content in a detailed and clear manner, capturing all important points.\n"
+        "2. Identify and list any other circulars, notifications, or references mentioned within the text.\n"
+        "3. If dates, numbers, or entities are mentioned, include them in the summary.\n"
+        "4. Present the summary in structured bullet points for easy readability.\n"
+        "5. Keep the language precise and professional, suitable for regulatory or financial reporting.\n"
+        "\n"
+        "Title: {title}\n"
+        "\n"
+        "Text to summarize:\n"
+        "\n"
+        "{text}\n"
+    )
+    
     def __init__(self):
         self.model = None
+        self.cache = SummaryCache()
         self._initialize_model()
     
     def _initialize_model(self):
-        """Initialize Gemini model"""
+        """Initialize Gemini model, building it only once per process"""
+        global _SINGLETON
+        with _LOCK:
+            if _SINGLETON is None:
+                _SINGLETON = self._build_model()
+        self.model = _SINGLETON
+    
+    def _build_model(self):
+        """Configure the SDK and build the Gemini model"""
         try:
             # Get API key from environment or Streamlit secrets
-            api_key = os.getenv('GOOGLE_API_KEY') or st.secrets.get('GOOGLE_API_KEY')
+            api_key = _api_key()
             
             if not api_key:
                 st.error("Google API key not found. Please set GOOGLE_API_KEY environment variable or add it to Streamlit secrets.")
-                return
+                return None
             
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+            _configure_sdk(api_key)
+            return genai.GenerativeModel(self.MODEL_NAME)
             
         except Exception as e:
             st.error(f"Failed to initialize Gemini model: {str(e)}")
-            self.model = None
+            return None
+    
+    @staticmethod
+    def _truncate_bytes(text: str, max_bytes: int) -> str:
+        """Truncate text to a UTF-8 byte budget without splitting a character"""
+        encoded = text.encode('utf-8')
+        if len(encoded) <= max_bytes:
+            return text
+        return encoded[:max_bytes].decode('utf-8', 'ignore')
+    
+    def _build_prompt(self, text: str, title: str = "") -> str:
+        """Build the summarization prompt for a notification"""
+        return self.PROMPT_TEMPLATE.format(
+            title=title,
+            text=self._truncate_bytes(text, self.MAX_TEXT_BYTES)
+        )
     
     def generate_summary(self, text: str, title: str = "") -> Optional[str]:
         """Generate summary using Gemini 2.0 Flash"""
         if not self.model:
             return None
         
+        # Reuse the summary of an identical notification (same title and text)
+        prompt = self._build_prompt(text, title)
+        cached = self.cache.lookup(prompt)
+        if cached:
+            return cached
+        
         try:
-            # Create a focused prompt for summarization
-            prompt = f"""
-            You are an expert in financial notifications and regulatory circulars. Read the following text carefully and do the following:
-1. Summarize the content in a detailed and clear manner, capturing all important points.
-2. Identify and list any other circulars, notifications, or references mentioned within the text.
-3. If dates, numbers, or entities are mentioned, include them in the summary.
-4. Present the summary in structured bullet points for easy readability.
-5. Keep the language precise and professional, suitable for regulatory or financial reporting.
-
-Title: {title}
-
-Text to summarize:
-
-{text}
-            """
-            
             response = self.model.generate_content(prompt)
-            return response.text.strip()
+            summary = response.text.strip()
             
         except Exception as e:
             st.error(f"Error generating summary: {str(e)}")
             return None
+        
+        if summary:
+            self.cache.add(prompt, summary)
+        return summary
+    
+    async def generate_summary_async(self, text: str, title: str = "") -> Optional[str]:
+        """Generate summary without blocking the event loop"""
+        if not self.model:
+            return None
+        
+        prompt = self._build_prompt(text, title)
+        cached = self.cache.lookup(prompt)
+        if cached:
+            return cached
+        
+        try:
+            response = await self.model.generate_content_async(prompt)
+            summary = response.text.strip()
+            
+        except Exception as e:
+            # Runs on the batch loop thread, where Streamlit calls are not rendered
+            print(f"Error generating summary: {str(e)}")
+            return None
+        
+        if summary:
+            self.cache.add(prompt, summary)
+        return summary
+    
+    def generate_batch(self, items: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """Generate summaries for (title, text) pairs concurrently, preserving order"""
+        if not self.model or not items:
+            return [None] * len(items)
+        
+        # GEMINI_BATCH_MODE=process overlaps requests across worker processes instead
+        if os.getenv('GEMINI_BATCH_MODE') == 'process':
+            return self.generate_many(items)
+        
+        async def _run():
+            # Bound in-flight requests so a large batch stays under the rate limit
+            semaphore = asyncio.Semaphore(max(1, self.REQUESTS_PER_MINUTE // 60))
+            
+            async def _limited(title, text):
+                async with semaphore:
+                    # A hung request must not block the waiting script thread forever
+                    return await asyncio.wait_for(
+                        self.generate_summary_async(text, title),
+                        self.REQUEST_TIMEOUT_SECONDS
+                    )
+            
+            return await asyncio.gather(
+                *[_limited(title, text) for title, text in items],
+                return_exceptions=True
+            )
+        
+        results = asyncio.run_coroutine_threadsafe(_run(), _batch_loop()).result()
+        results = [None if isinstance(r, BaseException) else r for r in results]
+        
+        # Requests the async path could not complete get a second attempt in worker processes
+        failed = [i for i, r in enumerate(results) if r is None]
+        if failed:
+            retried = self.generate_many([items[i] for i in failed])
+            for i, summary in zip(failed, retried):
+                results[i] = summary
+        return results
+    
+    def generate_many(self, items: List[Tuple[str, str]], max_workers: int = 8) -> List[Optional[str]]:
+        """Generate summaries for (title, text) pairs across worker processes, preserving order"""
+        if not self.model or not items:
+            return [None] * len(items)
+        
+        prompts = [self._build_prompt(text, title) for title, text in items]
+        summaries = [self.cache.lookup(prompt) for prompt in prompts]
+        missing = [i for i, summary in enumerate(summaries) if not summary]
+        if not missing:
+            return summaries
+        
+        try:
+            # Spawn fresh workers: forking this process would copy its live gRPC state
+            with ProcessPoolExecutor(
+                max_workers=min(max_workers, len(missing)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(_api_key(), self.MODEL_NAME, self.REQUEST_TIMEOUT_SECONDS)
+            ) as executor:
+                generated = list(executor.map(_generate_in_worker, [prompts[i] for i in missing]))
+        except Exception as e:
+            st.error(f"Error generating summaries: {str(e)}")
+            return summaries
+        
+        for i, summary in zip(missing, generated):
+            if summary:
+                self.cache.add(prompts[i], summary)
+                summaries[i] = summary
+        return summaries
     
     def is_available(self) -> bool:
         """Check if Gemini service is available"""
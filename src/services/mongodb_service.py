@@ -1,60 +1,231 @@
-from pymongo import MongoClient
-from typing import Optional, List, Dict
+from pymongo import MongoClient, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from typing import Optional, List, Dict, Tuple
 import os
+import re
+import threading
+import time
 from datetime import datetime
 from models.data_models import Notification
 from dotenv import load_dotenv
 
 load_dotenv()
 
+DEFAULT_MONGODB_URI = 'mongodb://localhost:27017/'
+DEFAULT_DATABASE = 'notification_summarizer'
+
+# (database, collection) pairs whose indexes this process has already ensured
+_indexes_ensured = set()
+
+# One pooled client per process; MongoClient is thread-safe
+_CLIENT = None
+_LOCK = threading.Lock()
+
+def _shared_client() -> MongoClient:
+    """Return the process-wide MongoClient, creating it on first use"""
+    global _CLIENT
+    with _LOCK:
+        if _CLIENT is None:
+            _CLIENT = MongoClient(
+                os.getenv('MONGODB_URI', DEFAULT_MONGODB_URI),
+                maxPoolSize=100,
+                minPoolSize=10,
+                waitQueueTimeoutMS=5000
+            )
+    return _CLIENT
+
+# Canonical decimal ids that fit in a signed 64-bit integer
+NUMERIC_ID_PATTERN = r'^(0|[1-9][0-9]{0,17})$'
+
+def stored_id(notification_id):
+    """Return the id as stored: numeric ids as integers, anything else unchanged"""
+    # Integer ids keep the unique index about half the size of string ids
+    if isinstance(notification_id, str) and re.match(NUMERIC_ID_PATTERN, notification_id):
+        return int(notification_id)
+    return notification_id
+
+def id_filter(notification_id) -> Dict:
+    """Query matching a notification id in either its integer or string form"""
+    # Databases loaded before ids were stored as integers keep string ids
+    # until convert_string_ids has run on them
+    value = stored_id(notification_id)
+    if isinstance(value, int):
+        return {"id": {"$in": [value, str(value)]}}
+    return {"id": value}
+
+def ids_filter(notification_ids: List[str]) -> Dict:
+    """Query matching any of several notification ids, in either form"""
+    values = []
+    for notification_id in notification_ids:
+        value = stored_id(notification_id)
+        values.append(value)
+        # Same fallback to the string form as id_filter
+        if isinstance(value, int):
+            values.append(str(value))
+    return {"id": {"$in": values}}
+
+def notifications_in_order(documents: List[Dict], notification_ids: List[str]) -> List[Optional[Notification]]:
+    """Map fetched documents back onto the requested ids, None where missing"""
+    by_id = {str(document['id']): notification_from_document(document) for document in documents}
+    return [by_id.get(str(notification_id)) for notification_id in notification_ids]
+
+def notification_from_document(document: Dict) -> Notification:
+    """Build a Notification from a stored document"""
+    return Notification(
+        # Numeric ids are stored as integers; the other fields are already strings,
+        # though older mongoimport loads left empty fields out entirely
+        id=str(document['id']),
+        date=document.get('date', ''),
+        title=document.get('title', ''),
+        url=document.get('url', ''),
+        text=document.get('text', ''),
+        summary=document.get('summary'),
+        created_at=document.get('created_at'),
+        updated_at=document.get('updated_at')
+    )
+
+# True when the summary is a non-empty string, the same predicate as
+# SUMMARY_PRESENT so dropdown checkmarks match the sidebar counts; evaluated
+# server-side so the summary text itself never leaves the database.
+# Summary saves and the migration strip whitespace, so none is whitespace-only.
+HAS_SUMMARY = {
+    "$and": [
+        {"$eq": [{"$type": "$summary"}, "string"]},
+        {"$gt": ["$summary", ""]}
+    ]
+}
+
+def dropdown_pipeline(limit: int) -> List[Dict]:
+    """Aggregation pipeline for dropdown options"""
+    # Order and limit first so only `limit` documents reach
+    # $project, which leaves out the large text field
+    return [
+        {"$sort": {"date": -1}},
+        {"$limit": limit},
+        # Each projected document is already a UI option
+        {"$project": {
+            "_id": 0,
+            "id": {"$toString": "$id"},
+            "title": {"$ifNull": ["$title", ""]},
+            "date": {"$ifNull": ["$date", ""]},
+            "has_summary": HAS_SUMMARY
+        }}
+    ]
+
+# Documents with a non-empty summary; also the filter of the summary_present
+# partial index, so counting them only walks that index
+SUMMARY_PRESENT = {"summary": {"$type": "string", "$gt": ""}}
+
+def collection_stats(total: int, with_summary: int) -> Dict:
+    """Build the collection statistics dict from the two counts"""
+    return {
+        "total_notifications": total,
+        "with_summaries": with_summary,
+        "without_summaries": total - with_summary
+    }
+
 class MongoDBService:
     """Service class for MongoDB operations"""
     
-    def __init__(self):
+    # How long a successful ping vouches for the connection
+    PING_TTL_SECONDS = 30
+    
+    def __init__(self, client: Optional[MongoClient] = None):
         self.client = None
         self.db = None
-        self._connect()
+        self._connected_at = None
+        self._connect(client)
     
-    def _connect(self):
-        """Connect to MongoDB"""
+    def _connect(self, client: Optional[MongoClient] = None):
+        """Connect to MongoDB, optionally through a preconfigured client"""
         try:
-            mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-            database_name = os.getenv('MONGODB_DATABASE', 'notification_summarizer')
+            database_name = os.getenv('MONGODB_DATABASE', DEFAULT_DATABASE)
             
-            self.client = MongoClient(mongodb_uri)
+            self.client = client if client is not None else _shared_client()
             self.db = self.client[database_name]
             
-            # Create collections if they don't exist
-            self._ensure_collections()
-            
         except Exception as e:
             print(f"Failed to connect to MongoDB: {str(e)}")
             self.client = None
             self.db = None
     
-    def _ensure_collections(self):
-        """Ensure required collections exist with indexes"""
+    def bootstrap(self):
+        """Ensure required collections exist with indexes and integer ids (once per process)"""
+        if not self.is_connected():
+            return
+        
+        for country in ('india', 'usa'):
+            collection_name = f"{country}_notifications"
+            key = (self.db.name, collection_name)
+            if key in _indexes_ensured:
+                continue
+            
+            collection = self.db[collection_name]
+            try:
+                # Create indexes for better performance; background builds
+                # don't block writes on an already-loaded collection
+                collection.create_index("id", unique=True, background=True)
+                collection.create_index("date", background=True)
+                collection.create_index("updated_at", background=True)
+                collection.create_index(
+                    [("summary", 1)],
+                    partialFilterExpression=SUMMARY_PRESENT,
+                    background=True,
+                    name="summary_present"
+                )
+                # Upgrade string ids left by earlier loads
+                self.convert_string_ids(country)
+                _indexes_ensured.add(key)
+            except Exception as e:
+                print(f"Warning: Could not create indexes: {e}")
+    
+    def presplit_for_migration(self, num_initial_chunks: int = 64):
+        """Shard the notification collections on a hashed id before a bulk load"""
         if not self.is_connected():
             return
         
         try:
-            # Create indexes for better performance
-            self.db.india_notifications.create_index("id", unique=True)
-            self.db.usa_notifications.create_index("id", unique=True)
-            self.db.india_notifications.create_index("date")
-            self.db.usa_notifications.create_index("date")
+            # Only mongos answers listShards; a standalone or replica set has nothing to split
+            self.client.admin.command('listShards')
+        except Exception:
+            return
+        
+        try:
+            self.client.admin.command('enableSharding', self.db.name)
         except Exception as e:
-            print(f"Warning: Could not create indexes: {e}")
+            print(f"Warning: Could not enable sharding: {e}")
+            return
+        
+        # Pre-created chunks spread inserts across shards without balancer migrations
+        for collection_name in ('india_notifications', 'usa_notifications'):
+            try:
+                self.client.admin.command(
+                    'shardCollection',
+                    f"{self.db.name}.{collection_name}",
+                    key={"id": "hashed"},
+                    numInitialChunks=num_initial_chunks
+                )
+            except Exception as e:
+                print(f"Warning: Could not pre-split {collection_name}: {e}")
     
     def is_connected(self) -> bool:
         """Check if MongoDB connection is active"""
+        if self.client is None:
+            return False
+        
+        # PyMongo monitors the server in the background, so a recent ping
+        # is trusted instead of round-tripping before every operation
+        now = time.monotonic()
+        if self._connected_at is not None and now - self._connected_at < self.PING_TTL_SECONDS:
+            return True
+        
         try:
             # Test the connection by pinging the server
-            if self.client is None:
-                return False
             self.client.admin.command('ping')
+            self._connected_at = now
             return True
         except Exception:
+            self._connected_at = None
             return False
     
     def get_notification_by_id(self, country: str, notification_id: str) -> Optional[Notification]:
@@ -66,24 +237,30 @@ class MongoDBService:
         collection = self.db[collection_name]
         
         try:
-            document = collection.find_one({"id": notification_id})
+            document = collection.find_one(id_filter(notification_id))
             if document:
-                return Notification(
-                    id=str(document['id']),
-                    date=str(document['date']),
-                    title=str(document['title']),
-                    url=str(document['url']),
-                    text=str(document['text']),
-                    summary=document.get('summary'),
-                    created_at=document.get('created_at'),
-                    updated_at=document.get('updated_at')
-                )
+                return notification_from_document(document)
         except Exception as e:
             print(f"Error retrieving notification: {str(e)}")
         
         return None
     
-    def get_dropdown_options(self, country: str, limit: int = 1000) -> List[Dict]:
+    def get_notifications_by_ids(self, country: str, notification_ids: List[str]) -> List[Optional[Notification]]:
+        """Get several notifications in one query, preserving the requested order"""
+        if not self.is_connected() or not notification_ids:
+            return [None] * len(notification_ids)
+        
+        collection_name = f"{country.lower()}_notifications"
+        collection = self.db[collection_name]
+        
+        try:
+            documents = list(collection.find(ids_filter(notification_ids)))
+            return notifications_in_order(documents, notification_ids)
+        except Exception as e:
+            print(f"Error retrieving notifications: {str(e)}")
+            return [None] * len(notification_ids)
+    
+    def get_dropdown_options(self, country: str, limit: int = 100) -> List[Dict]:
         """Get dropdown options for UI"""
         if not self.is_connected():
             return []
@@ -92,26 +269,31 @@ class MongoDBService:
         collection = self.db[collection_name]
         
         try:
-            cursor = collection.find(
-                {},
-                {"id": 1, "title": 1, "date": 1, "summary": 1}
-            ).sort({"date": -1}).limit(limit)
-            
-            options = []
-            for doc in cursor:
-                options.append({
-                    'id': str(doc['id']),
-                    'title': str(doc['title']),
-                    'date': str(doc['date']),
-                    'has_summary': bool(doc.get('summary') and str(doc['summary']).strip())
-                })
-            
-            return options
+            return list(collection.aggregate(dropdown_pipeline(limit)))
             
         except Exception as e:
             print(f"Error retrieving dropdown options: {str(e)}")
             return []
     
+    def get_last_modified(self, country: str) -> Optional[datetime]:
+        """Get the most recent updated_at in a collection, used as a cache key"""
+        if not self.is_connected():
+            return None
+        
+        collection_name = f"{country.lower()}_notifications"
+        collection = self.db[collection_name]
+        
+        try:
+            document = collection.find_one(
+                {},
+                {"_id": 0, "updated_at": 1},
+                sort=[("updated_at", -1)]
+            )
+            return document.get('updated_at') if document else None
+        except Exception as e:
+            print(f"Error retrieving last modified time: {str(e)}")
+            return None
+    
     def save_summary(self, country: str, notification_id: str, summary: str) -> bool:
         """Save summary to MongoDB"""
         if not self.is_connected():
@@ -122,10 +304,10 @@ class MongoDBService:
         
         try:
             result = collection.update_one(
-                {"id": notification_id},
+                id_filter(notification_id),
                 {
                     "$set": {
-                        "summary": summary,
+                        "summary": summary.strip(),
                         "updated_at": datetime.utcnow()
                     }
                 }
@@ -135,6 +317,33 @@ class MongoDBService:
             print(f"Error saving summary: {str(e)}")
             return False
     
+    def save_summaries_bulk(self, country: str, pairs: List[Tuple[str, str]]) -> int:
+        """Save (notification_id, summary) pairs in one round-trip; returns the modified count"""
+        if not pairs or not self.is_connected():
+            return 0
+        
+        collection_name = f"{country.lower()}_notifications"
+        collection = self.db[collection_name]
+        
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                id_filter(notification_id),
+                {"$set": {"summary": summary.strip(), "updated_at": now}}
+            )
+            for notification_id, summary in pairs
+        ]
+        
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            return result.modified_count
+        except BulkWriteError as e:
+            # Updates that succeeded are kept even if some failed
+            return e.details.get('nModified', 0)
+        except Exception as e:
+            print(f"Error saving summaries: {str(e)}")
+            return 0
+    
     def insert_notification(self, country: str, notification: Notification) -> bool:
         """Insert a new notification into MongoDB"""
         if not self.is_connected():
@@ -145,7 +354,7 @@ class MongoDBService:
         
         try:
             document = {
-                "id": notification.id,
+                "id": stored_id(notification.id),
                 "date": notification.date,
                 "title": notification.title,
                 "url": notification.url,
@@ -161,6 +370,95 @@ class MongoDBService:
             print(f"Error inserting notification: {str(e)}")
             return False
     
+    def insert_raw_documents(self, country: str, documents: List[Dict], batch_size: int = 1000, upsert: bool = False) -> int:
+        """Insert ready-made notification documents in batches, returning how many were inserted (or sent, for w=0)
+        
+        Documents are stored as given, so callers supply stored ids and timestamps.
+        With upsert, documents whose id already exists are skipped instead of
+        reported as duplicate key errors, so a load can be re-run safely.
+        """
+        if not self.is_connected():
+            return 0
+        
+        collection_name = f"{country.lower()}_notifications"
+        collection = self.db[collection_name]
+        
+        inserted_count = 0
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            
+            # bulk_write encodes each operation's document once
+            if upsert:
+                operations = [
+                    UpdateOne({"id": document["id"]}, {"$setOnInsert": document}, upsert=True)
+                    for document in batch
+                ]
+            else:
+                operations = [InsertOne(document) for document in batch]
+            
+            try:
+                # PyMongo rejects bypass_document_validation on unacknowledged writes
+                result = collection.bulk_write(
+                    operations,
+                    ordered=False,
+                    bypass_document_validation=collection.write_concern.acknowledged
+                )
+                if result.acknowledged:
+                    inserted_count += result.inserted_count + result.upserted_count
+                else:
+                    inserted_count += len(operations)
+            except BulkWriteError as bwe:
+                # Unordered inserts keep going past failures such as duplicate ids
+                failed = len(bwe.details.get('writeErrors', []))
+                inserted_count += bwe.details.get('nInserted', 0) + bwe.details.get('nUpserted', 0)
+                print(f"Warning: {failed} notifications failed to insert")
+            except Exception as e:
+                print(f"Error inserting notifications: {str(e)}")
+        
+        return inserted_count
+    
+    def finalize_import(self, country: str, loaded_at: datetime) -> int:
+        """Stamp documents loaded without timestamps and store empty-string summaries as null; returns the number changed"""
+        if not self.is_connected():
+            return 0
+        
+        collection_name = f"{country.lower()}_notifications"
+        collection = self.db[collection_name]
+        
+        try:
+            # One pipeline update fixes both, so get_last_modified sees the load
+            result = collection.update_many(
+                {"created_at": {"$exists": False}},
+                [{"$set": {
+                    "created_at": loaded_at,
+                    "updated_at": loaded_at,
+                    "summary": {"$cond": [{"$eq": ["$summary", ""]}, None, "$summary"]}
+                }}]
+            )
+            return result.modified_count
+        except Exception as e:
+            print(f"Error finalizing import: {str(e)}")
+            return 0
+    
+    def convert_string_ids(self, country: str) -> int:
+        """Rewrite numeric string ids as integers; returns the number converted"""
+        if not self.is_connected():
+            return 0
+        
+        collection_name = f"{country.lower()}_notifications"
+        collection = self.db[collection_name]
+        
+        try:
+            # The pipeline update converts every matching document server-side
+            result = collection.update_many(
+                {"id": {"$type": "string", "$regex": NUMERIC_ID_PATTERN}},
+                [{"$set": {"id": {"$toLong": "$id"}}}]
+            )
+            return result.modified_count
+        except Exception as e:
+            print(f"Error converting ids: {str(e)}")
+            return 0
+    
     def get_collection_stats(self, country: str) -> Dict:
         """Get collection statistics"""
         if not self.is_connected():
@@ -170,19 +468,17 @@ class MongoDBService:
         collection = self.db[collection_name]
         
         try:
-            total_count = collection.count_documents({})
-            with_summary = collection.count_documents({"summary": {"$exists": True, "$ne": None, "$ne": ""}})
-            
-            return {
-                "total_notifications": total_count,
-                "with_summaries": with_summary,
-                "without_summaries": total_count - with_summary
-            }
+            # The total comes from collection metadata rather than a scan
+            return collection_stats(
+                collection.estimated_document_count(),
+                collection.count_documents(SUMMARY_PRESENT)
+            )
         except Exception as e:
             print(f"Error getting collection stats: {str(e)}")
             return {}
     
     def close_connection(self):
         """Close MongoDB connection"""
-        if self.client:
+        # The shared client outlives any one service
+        if self.client and self.client is not _CLIENT:
             self.client.close()
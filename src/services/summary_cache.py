@@ -0,0 +1,59 @@
+import hashlib
+import sqlite3
+import threading
+from typing import Optional
+
+class SummaryCache:
+    """Prompt-keyed cache of generated summaries, persisted to SQLite"""
+
+    def __init__(self, path: str = "./summary_cache.sqlite"):
+        self.path = path
+        self.summaries = {}
+        self._conn = None
+        # One cache is shared by every Streamlit session thread
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Open the cache database and load stored summaries into memory"""
+        try:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS prompt_summaries (digest TEXT PRIMARY KEY, summary TEXT NOT NULL)"
+            )
+            rows = self._conn.execute("SELECT digest, summary FROM prompt_summaries").fetchall()
+        except Exception as e:
+            print(f"Error loading summary cache: {e}")
+            self._conn = None
+            return
+
+        self.summaries = dict(rows)
+
+    @staticmethod
+    def _digest(prompt: str) -> str:
+        """Key a prompt by its SHA-256 digest"""
+        # Only identical prompts share a summary: templated circulars that differ
+        # only in dates or amounts must each get their own
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    def lookup(self, prompt: str) -> Optional[str]:
+        """Return the summary generated for an identical prompt, if any"""
+        digest = self._digest(prompt)
+        with self._lock:
+            return self.summaries.get(digest)
+
+    def add(self, prompt: str, summary: str):
+        """Store the summary generated for a prompt"""
+        digest = self._digest(prompt)
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    with self._conn:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO prompt_summaries (digest, summary) VALUES (?, ?)",
+                            (digest, summary)
+                        )
+                except Exception as e:
+                    print(f"Error saving to summary cache: {e}")
+
+            self.summaries[digest] = summary
@@ -0,0 +1,29 @@
+"""
+Dropdown helpers shared by the CSV and MongoDB apps
+"""
+import numpy as np
+import streamlit as st
+from typing import List, Optional, Tuple
+
+@st.cache_data
+def build_labels(options_tuple: tuple, truncate: Optional[int] = None) -> Tuple[List[str], List[Optional[str]]]:
+    """Build dropdown labels/values from (id, title, date, has_summary) tuples"""
+    labels = ["🔍 Select a notification..."]
+    values = [None]
+    
+    if options_tuple:
+        ids, titles, dates, has_summary = zip(*options_tuple)
+        titles = np.array(titles, dtype=str)
+        if truncate:
+            # Casting to a `truncate`-character dtype cuts longer titles short
+            titles = np.where(
+                np.char.str_len(titles) > truncate,
+                np.char.add(titles.astype(f'<U{truncate}'), '...'),
+                titles
+            )
+        built = np.char.add(np.char.add(titles, ' | '), np.array(dates, dtype=str))
+        built = np.char.add(built, np.where(np.array(has_summary, dtype=bool), ' ✅', ''))
+        labels += built.tolist()
+        values += list(ids)
+    
+    return labels, values
@@ -2,21 +2,192 @@
 Migration script to transfer data from CSV to MongoDB
 """
 import pandas as pd
+import os
+import re
+import shutil
+import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from datetime import datetime
+from typing import Callable, Iterable, Tuple
+from pymongo import MongoClient
 
 # Add src directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from services.mongodb_service import MongoDBService
-from models.data_models import Notification
+from services.mongodb_service import MongoDBService, DEFAULT_MONGODB_URI, DEFAULT_DATABASE, stored_id
+from models.data_models import DataLoader
 
 class DataMigration:
     """Handle migration from CSV to MongoDB"""
     
+    # Rows sent to MongoDB per insert_many round-trip
+    BATCH_SIZE = 1000
+    
+    # Rows parsed from the CSV at a time; bounds memory during the load
+    CHUNK_SIZE = 5000
+    
+    # Threads sending insert batches concurrently over the shared bulk client
+    INSERT_WORKERS = 16
+    
+    # Columns stored for each notification, in mongoimport field order
+    COLUMNS = ['id', 'date', 'title', 'url', 'text', 'summary']
+    
     def __init__(self):
         self.mongodb_service = MongoDBService()
+        # Unacknowledged writes for the one-shot bulk load; duplicates of the
+        # unique id are dropped server-side. Interactive calls keep w=1.
+        # Notification text compresses well, so the load also compresses on the
+        # wire (zlib is used if zstandard is not installed).
+        self.bulk_client = MongoClient(
+            os.getenv('MONGODB_URI', DEFAULT_MONGODB_URI),
+            w=0,
+            compressors='zstd,zlib',
+            zlibCompressionLevel=-1
+        )
+        self.bulk_service = MongoDBService(client=self.bulk_client)
+    
+    @staticmethod
+    def _normalize_india(df: pd.DataFrame) -> pd.DataFrame:
+        """Give an India CSV chunk the notification columns"""
+        # Check if summary column already exists
+        if 'summary' not in df.columns:
+            df.columns = ['index', 'id', 'date', 'title', 'url', 'text']
+            df['summary'] = None
+        return df
+    
+    @staticmethod
+    def _normalize_usa(df: pd.DataFrame) -> pd.DataFrame:
+        """Give a USA CSV chunk the notification columns"""
+        # Check if summary column already exists
+        if 'summary' not in df.columns:
+            df.columns = ['index', 'date', 'title', 'url', 'text']
+            df['summary'] = None
+        df['id'] = df['index']
+        return df
+    
+    def _read_chunks(self, country: str, csv_path: str, normalize: Callable[[pd.DataFrame], pd.DataFrame]) -> Iterable[pd.DataFrame]:
+        """Stream a CSV as normalized notification DataFrames of CHUNK_SIZE rows"""
+        # Summaries generated in the CSV app live in a sidecar next to the CSV
+        loader = DataLoader(os.path.dirname(csv_path) or '.')
+        saved = loader.saved_summaries(country)
+        
+        # Every field is parsed as a string, so nothing needs converting per row;
+        # only an empty summary becomes missing
+        reader = pd.read_csv(
+            csv_path,
+            chunksize=self.CHUNK_SIZE,
+            dtype=str,
+            keep_default_na=False,
+            na_values={'summary': ['']}
+        )
+        for df in reader:
+            df = normalize(df)
+            if saved is not None:
+                df = loader._merge_summaries(df, country, saved)
+            # Whitespace-only summaries count as missing, as in the has_summary checks
+            summary = df['summary'].str.strip()
+            df['summary'] = summary.where(summary.notna() & (summary != ''), None)
+            yield df[self.COLUMNS]
+    
+    def _mongoimport(self, country: str, chunks: Iterable[pd.DataFrame]):
+        """Load normalized DataFrame chunks with the mongoimport tool; None if it cannot run"""
+        if shutil.which('mongoimport') is None:
+            return None
+        
+        row_count = 0
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', newline='', delete=False) as f:
+            for df in chunks:
+                df.to_csv(f, index=False, header=False)
+                row_count += len(df)
+            csv_path = f.name
+        
+        try:
+            result = subprocess.run(
+                [
+                    'mongoimport',
+                    '--uri', os.getenv('MONGODB_URI', DEFAULT_MONGODB_URI),
+                    '--db', os.getenv('MONGODB_DATABASE', DEFAULT_DATABASE),
+                    '--collection', f"{country}_notifications",
+                    '--type', 'csv',
+                    '--columnsHaveTypes',
+                    # Ids load as strings; convert_string_ids turns numeric ones into integers
+                    '--fields', 'id.string(),date.string(),title.string(),url.string(),text.string(),summary.string()',
+                    '--numInsertionWorkers', '8',
+                    '--file', csv_path
+                ],
+                capture_output=True,
+                text=True
+            )
+        except Exception as e:
+            print(f"Could not run mongoimport: {str(e)}")
+            return None
+        finally:
+            os.remove(csv_path)
+        
+        # mongoimport logs progress and its final counts to stderr
+        match = re.search(r"(\d+) document\(s\) imported successfully", result.stderr)
+        if result.returncode != 0 and match is None:
+            print(f"mongoimport failed: {result.stderr.strip()}")
+            return None
+        return int(match.group(1)) if match else row_count
+    
+    def _migrate_csv(self, country: str, csv_path: str, normalize: Callable[[pd.DataFrame], pd.DataFrame]) -> Tuple[int, bool]:
+        """Stream a notification CSV into MongoDB in batches
+        
+        Returns the document count and whether it was acknowledged: mongoimport
+        reports what it imported, while unacknowledged upserts only count what
+        was sent, including notifications that were already stored.
+        """
+        # Fast path for the initial load: mongoimport streams the CSV to the server
+        # without per-row Python work. It stores string ids, so re-runs over
+        # existing (integer-id) data take the upsert path below instead.
+        stats = self.mongodb_service.get_collection_stats(country)
+        initial_load = stats.get('total_notifications', 0) == 0
+        imported_count = self._mongoimport(country, self._read_chunks(country, csv_path, normalize)) if initial_load else None
+        if imported_count is not None:
+            # mongoimport writes no timestamps, and blank cells import as empty
+            # strings where a missing summary should be null
+            self.mongodb_service.finalize_import(country, datetime.utcnow())
+            return imported_count, True
+        
+        # Every document in the load shares one timestamp
+        now = datetime.utcnow()
+        
+        success_count = 0
+        with ThreadPoolExecutor(max_workers=self.INSERT_WORKERS) as executor:
+            pending = set()
+            for df in self._read_chunks(country, csv_path, normalize):
+                # Build the stored documents straight from the columns, with no
+                # intermediate Notification objects
+                documents = df.assign(
+                    id=df['id'].map(stored_id),
+                    created_at=now,
+                    updated_at=now
+                ).to_dict('records')
+                
+                for start in range(0, len(documents), self.BATCH_SIZE):
+                    # Upserts skip notifications that are already stored, so the
+                    # migration can be re-run safely
+                    pending.add(executor.submit(
+                        self.bulk_service.insert_raw_documents,
+                        country, documents[start:start + self.BATCH_SIZE], self.BATCH_SIZE, True
+                    ))
+                    
+                    # Bound the batches held in memory while workers catch up
+                    if len(pending) >= 2 * self.INSERT_WORKERS:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        success_count += sum(future.result() for future in done)
+                        print(f"Sent {success_count} notifications...")
+            
+            success_count += sum(future.result() for future in pending)
+        
+        # An acknowledged round-trip on the bulk client, so the unacknowledged
+        # batches have reached the server before anything reads the collection
+        self.bulk_client.admin.command('ping')
+        return success_count, False
     
     def migrate_india_data(self, csv_path: str) -> bool:
         """Migrate India data from CSV to MongoDB"""
@@ -25,37 +196,14 @@ class DataMigration:
             return False
         
         try:
-            # Load CSV data
-            df = pd.read_csv(csv_path)
-            
-            # Check if summary column already exists
-            if 'summary' not in df.columns:
-                df.columns = ['index', 'id', 'date', 'title', 'url', 'text']
-                df['summary'] = None
-            else:
-                # If summary column exists, use the existing columns
-                pass
+            print("Migrating India notifications...")
             
-            print(f"Migrating {len(df)} India notifications...")
+            success_count, acknowledged = self._migrate_csv('india', csv_path, self._normalize_india)
             
-            success_count = 0
-            for _, row in df.iterrows():
-                notification = Notification(
-                    id=str(row['id']),
-                    date=str(row['date']),
-                    title=str(row['title']),
-                    url=str(row['url']),
-                    text=str(row['text']),
-                    summary=row['summary'] if pd.notna(row['summary']) else None
-                )
-                
-                if self.mongodb_service.insert_notification('india', notification):
-                    success_count += 1
-                
-                if success_count % 1000 == 0:
-                    print(f"Migrated {success_count} notifications...")
-            
-            print(f"Successfully migrated {success_count} India notifications")
+            if acknowledged:
+                print(f"Successfully migrated {success_count} India notifications")
+            else:
+                print(f"Sent {success_count} India notifications (already stored ones are skipped)")
             return True
             
         except Exception as e:
@@ -69,38 +217,14 @@ class DataMigration:
             return False
         
         try:
-            # Load CSV data
-            df = pd.read_csv(csv_path)
+            print("Migrating USA notifications...")
             
-            # Check if summary column already exists
-            if 'summary' not in df.columns:
-                df.columns = ['index', 'date', 'title', 'url', 'text']
-                df['id'] = df['index'].astype(str)
-                df['summary'] = None
-            else:
-                # If summary column exists, use the existing columns
-                df['id'] = df['index'].astype(str)
-            
-            print(f"Migrating {len(df)} USA notifications...")
-            
-            success_count = 0
-            for _, row in df.iterrows():
-                notification = Notification(
-                    id=str(row['id']),
-                    date=str(row['date']),
-                    title=str(row['title']),
-                    url=str(row['url']),
-                    text=str(row['text']),
-                    summary=row['summary'] if pd.notna(row['summary']) else None
-                )
-                
-                if self.mongodb_service.insert_notification('usa', notification):
-                    success_count += 1
-                
-                if success_count % 1000 == 0:
-                    print(f"Migrated {success_count} notifications...")
+            success_count, acknowledged = self._migrate_csv('usa', csv_path, self._normalize_usa)
             
-            print(f"Successfully migrated {success_count} USA notifications")
+            if acknowledged:
+                print(f"Successfully migrated {success_count} USA notifications")
+            else:
+                print(f"Sent {success_count} USA notifications (already stored ones are skipped)")
             return True
             
         except Exception as e:
@@ -116,11 +240,22 @@ class DataMigration:
             print("MongoDB connection failed. Please check your MongoDB setup.")
             return False
         
-        # Migrate India data
-        india_success = self.migrate_india_data(f"{data_dir}/IND_data.csv")
+        # Indexes are built once up front rather than on service construction
+        self.mongodb_service.bootstrap()
+        
+        # On a sharded cluster, split the collections before loading
+        self.mongodb_service.presplit_for_migration()
+        
+        # Migrate India and USA data concurrently; both are I/O-bound
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            india_future = executor.submit(self.migrate_india_data, f"{data_dir}/IND_data.csv")
+            usa_future = executor.submit(self.migrate_usa_data, f"{data_dir}/USA_data.csv")
+            india_success = india_future.result()
+            usa_success = usa_future.result()
         
-        # Migrate USA data
-        usa_success = self.migrate_usa_data(f"{data_dir}/USA_data.csv")
+        # mongoimport and older loads store numeric ids as strings
+        for country in ('india', 'usa'):
+            self.mongodb_service.convert_string_ids(country)
         
         if india_success and usa_success:
             print("✅ All data migrated successfully!")